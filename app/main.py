@@ -1,14 +1,23 @@
 """
 FastAPI application with OCR and NLP endpoints.
 """
+import asyncio
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import orjson
 from fastapi import FastAPI, File, UploadFile, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 
 from app.schemas import (
     OCRResponse,
     FeedbackRequest,
     FeedbackResponse,
+    BatchFeedbackRequest,
+    BatchFeedbackResponse,
     InsightsResponse,
     SentimentDistribution,
     KeywordStat,
@@ -16,12 +25,14 @@ from app.schemas import (
 )
 from app.ocr.bill_ocr import (
     extract_text_from_image,
+    init_ocr_worker,
     parse_services,
     parse_date,
     calculate_total_price
 )
 from app.nlp.sentiment import (
-    analyze_sentiment,
+    SentimentResult,
+    analyze_texts,
     extract_keywords,
     preprocess_text
 )
@@ -34,24 +45,129 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Services API",
     description="API for OCR bill processing and NLP customer feedback analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Number of server worker processes (uvicorn also reads this for --workers)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Maximum concurrent OCR jobs, and OCR worker processes, per server worker.
+# Defaults to an even share of the CPUs; also bounds how many uploads are
+# held in memory at once
+OCR_CONCURRENCY = int(os.getenv(
+    "OCR_CONCURRENCY", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+))
+ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+
+# Process pool for CPU-bound OCR work, created on startup
+ocr_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _create_ocr_pool() -> ProcessPoolExecutor:
+    """Create a process pool for OCR jobs."""
+    return ProcessPoolExecutor(max_workers=OCR_CONCURRENCY, initializer=init_ocr_worker)
+
+
+async def _start_ocr_workers(pool: ProcessPoolExecutor) -> None:
+    """
+    Start all workers of an OCR process pool.
+    
+    ProcessPoolExecutor only forks workers as jobs are submitted, so one
+    no-op job per worker is run up front. This loads the Tesseract model in
+    each worker (see init_ocr_worker) before any OCR job has to wait for it,
+    and at startup forks the workers while the server is still single-threaded.
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(OCR_CONCURRENCY)))
+    logger.info("OCR process pool started with %d workers", OCR_CONCURRENCY)
+
+
+@app.on_event("startup")
+async def startup_ocr_pool():
+    """Create the process pool used to run OCR off the event loop."""
+    global ocr_pool
+    ocr_pool = _create_ocr_pool()
+    await _start_ocr_workers(ocr_pool)
+
+
+@app.on_event("shutdown")
+async def shutdown_ocr_pool():
+    """Shut down the OCR process pool."""
+    global ocr_pool
+    if ocr_pool is not None:
+        ocr_pool.shutdown(wait=True)
+        ocr_pool = None
+
+
+async def _run_ocr(image_bytes: bytes) -> str:
+    """
+    Extract text from an image in the OCR process pool.
+    
+    If a pool worker dies (e.g. killed for running out of memory), the pool
+    is unusable from then on, so it is replaced by a pool with started
+    workers and the job retried once.
+    
+    Args:
+        image_bytes: Image file as bytes
+        
+    Returns:
+        Extracted text string
+        
+    Raises:
+        BrokenProcessPool: If the job kills the replacement pool as well
+    """
+    global ocr_pool
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = ocr_pool
+        try:
+            return await loop.run_in_executor(pool, extract_text_from_image, image_bytes)
+        except BrokenProcessPool:
+            logger.warning("OCR process pool broken, restarting it (attempt %d)", attempt + 1)
+            # Concurrent jobs fail together; only the first one replaces the pool
+            if ocr_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                ocr_pool = _create_ocr_pool()
+                await _start_ocr_workers(ocr_pool)
+            if attempt:
+                raise
+
+
+@app.on_event("startup")
+async def startup_keyword_extractor():
+    """
+    Warm up TextBlob before serving.
+    
+    TextBlob trains its noun phrase extractor and loads NLTK corpora lazily,
+    and neither is safe to do from several executor threads at once. One
+    extraction here does it on a single thread before any request arrives.
+    """
+    extract_keywords("warm up text")
+
+
+# Static payloads, serialized once at import
+_ROOT_PAYLOAD = orjson.dumps({
+    "message": "AI Services API",
+    "version": "1.0.0",
+    "endpoints": ["/api/ocr/bill", "/api/nlp/feedback", "/api/nlp/feedback/batch", "/api/nlp/insights"]
+})
+_HEALTH_PAYLOAD = orjson.dumps({"status": "healthy"})
+
+# Serialized insights payload and the feedback store version it was built from
+_insights_payload: Optional[Tuple[int, bytes]] = None
+
 
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "AI Services API",
-        "version": "1.0.0",
-        "endpoints": ["/api/ocr/bill", "/api/nlp/feedback", "/api/nlp/insights"]
-    }
+    return Response(content=_ROOT_PAYLOAD, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_PAYLOAD, media_type="application/json")
 
 
 @app.post("/api/ocr/bill", response_model=OCRResponse)
@@ -76,19 +192,24 @@ async def process_bill_ocr(file: UploadFile = File(...)):
         )
     
     try:
-        # Read image file
-        image_bytes = await file.read()
-        
-        if not image_bytes:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Empty file uploaded"
-            )
-        
-        logger.info(f"Processing image: {file.filename}, size: {len(image_bytes)} bytes")
-        
-        # Extract text using OCR
-        raw_text = extract_text_from_image(image_bytes)
+        # Only OCR_CONCURRENCY uploads are read into memory at a time; the
+        # rest wait here with their bodies still in the spooled upload file
+        async with ocr_semaphore:
+            # Read image file; compressed bytes are the smallest payload to hand
+            # to the OCR worker process, which decodes the image itself
+            image_bytes = await file.read()
+            
+            if not image_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Empty file uploaded"
+                )
+            
+            logger.info("Processing image: %s, size: %d bytes", file.filename, len(image_bytes))
+            
+            # Extract text using OCR in the process pool to keep the event loop free
+            raw_text = await _run_ocr(image_bytes)
+            del image_bytes
         
         if not raw_text or not raw_text.strip():
             return OCRResponse(
@@ -105,7 +226,7 @@ async def process_bill_ocr(file: UploadFile = File(...)):
         date = parse_date(raw_text)
         total_price = calculate_total_price(services)
         
-        logger.info(f"Extracted {len(services)} services, date: {date}, total: {total_price}")
+        logger.info("Extracted %d services, date: %s, total: %s", len(services), date, total_price)
         
         return OCRResponse(
             raw_text=raw_text.strip(),
@@ -119,13 +240,67 @@ async def process_bill_ocr(file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing bill OCR: {str(e)}", exc_info=True)
+        logger.error("Error processing bill OCR: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process image: {str(e)}"
         )
 
 
+def _record_feedback(feedback: str, sentiment_result: SentimentResult, keywords: List[str]) -> FeedbackResponse:
+    """
+    Store an analyzed feedback text for analytics and build its response.
+    
+    Args:
+        feedback: Original feedback text
+        sentiment_result: Sentiment analysis of the feedback
+        keywords: Keywords extracted from the feedback
+        
+    Returns:
+        FeedbackResponse for the feedback text
+    """
+    feedback_store.add_feedback(
+        feedback=feedback,
+        sentiment=sentiment_result.label,
+        polarity=sentiment_result.polarity,
+        subjectivity=sentiment_result.subjectivity,
+        keywords=keywords,
+        confidence=sentiment_result.confidence
+    )
+    
+    return FeedbackResponse(
+        sentiment=sentiment_result.label,
+        confidence=round(sentiment_result.confidence, 3),
+        polarity=round(sentiment_result.polarity, 3),
+        subjectivity=round(sentiment_result.subjectivity, 3),
+        keywords=keywords,
+        success=True,
+        message="Feedback analysis completed successfully"
+    )
+
+
+async def _analyze_and_record(feedbacks: List[str], processed_texts: List[str]) -> List[FeedbackResponse]:
+    """
+    Analyze feedback texts off the event loop and store the results.
+    
+    Sentiment and keywords for all texts are computed in one executor call.
+    
+    Args:
+        feedbacks: Original feedback texts
+        processed_texts: Preprocessed feedback texts, in the same order
+        
+    Returns:
+        FeedbackResponse per feedback text, in the same order
+    """
+    loop = asyncio.get_running_loop()
+    analyses = await loop.run_in_executor(None, analyze_texts, processed_texts)
+    
+    return [
+        _record_feedback(feedback, sentiment_result, keywords)
+        for feedback, (sentiment_result, keywords) in zip(feedbacks, analyses)
+    ]
+
+
 @app.post("/api/nlp/feedback", response_model=FeedbackResponse)
 async def analyze_feedback(request: FeedbackRequest):
     """
@@ -156,43 +331,73 @@ async def analyze_feedback(request: FeedbackRequest):
                 detail="Feedback text contains no valid content after preprocessing"
             )
         
-        logger.info(f"Analyzing feedback: {len(processed_text)} characters")
+        logger.info("Analyzing feedback: %d characters", len(processed_text))
         
-        # Analyze sentiment
-        sentiment_result = analyze_sentiment(processed_text)
+        # Same path as the batch endpoint, with a batch of one
+        [response] = await _analyze_and_record([request.feedback], [processed_text])
         
-        # Extract keywords
-        keywords = extract_keywords(processed_text, max_keywords=10)
+        logger.info(
+            "Sentiment: %s, Confidence: %.2f, Keywords: %d",
+            response.sentiment, response.confidence, len(response.keywords)
+        )
         
-        logger.info(f"Sentiment: {sentiment_result.label}, Confidence: {sentiment_result.confidence:.2f}, Keywords: {len(keywords)}")
+        return response
         
-        # Store feedback for analytics
-        feedback_store.add_feedback(
-            feedback=request.feedback,
-            sentiment=sentiment_result.label,
-            polarity=sentiment_result.polarity,
-            subjectivity=sentiment_result.subjectivity,
-            keywords=keywords,
-            confidence=sentiment_result.confidence
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error analyzing feedback: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze feedback: {str(e)}"
         )
+
+
+@app.post("/api/nlp/feedback/batch", response_model=BatchFeedbackResponse)
+async def analyze_feedback_batch(request: BatchFeedbackRequest):
+    """
+    Analyze a batch of customer feedback texts in one request.
+    
+    Sentiment and keywords for the whole batch are computed off the event
+    loop in one executor call, amortizing per-request overhead for bulk ingestion.
+    
+    Args:
+        request: BatchFeedbackRequest with feedback texts
+        
+    Returns:
+        BatchFeedbackResponse with one analysis result per feedback text
+        
+    Raises:
+        HTTPException: If processing fails
+    """
+    try:
+        # Preprocess texts
+        processed_texts = [preprocess_text(feedback) for feedback in request.feedback]
+        
+        for index, processed_text in enumerate(processed_texts):
+            if not processed_text:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Feedback text at index {index} contains no valid content after preprocessing"
+                )
+        
+        logger.info("Analyzing feedback batch: %d texts", len(processed_texts))
+        
+        results = await _analyze_and_record(request.feedback, processed_texts)
         
-        return FeedbackResponse(
-            sentiment=sentiment_result.label,
-            confidence=round(sentiment_result.confidence, 3),
-            polarity=round(sentiment_result.polarity, 3),
-            subjectivity=round(sentiment_result.subjectivity, 3),
-            keywords=keywords,
+        return BatchFeedbackResponse(
+            results=results,
             success=True,
-            message="Feedback analysis completed successfully"
+            message="Batch feedback analysis completed successfully"
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error analyzing feedback: {str(e)}", exc_info=True)
+        logger.error("Error analyzing feedback batch: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to analyze feedback: {str(e)}"
+            detail=f"Failed to analyze feedback batch: {str(e)}"
         )
 
 
@@ -207,38 +412,49 @@ async def get_feedback_insights():
     Raises:
         HTTPException: If processing fails
     """
+    global _insights_payload
     try:
         logger.info("Generating feedback insights")
         
+        # Reuse the serialized payload until the next feedback write. The
+        # version is read before the snapshot, so a concurrent write can
+        # only cause an extra rebuild, never a stale payload
+        version = feedback_store.version
+        cached = _insights_payload
+        if cached is not None and cached[0] == version:
+            return Response(content=cached[1], media_type="application/json")
+        
         # Get analytics data
-        total_feedback = feedback_store.get_total_count()
-        sentiment_dist = feedback_store.get_sentiment_distribution()
-        top_keywords = feedback_store.get_top_keywords(limit=20)
-        avg_confidence = feedback_store.get_average_confidence()
-        avg_polarity = feedback_store.get_average_polarity()
+        insights = feedback_store.get_insights(keyword_limit=20)
+        
+        sentiment_dist = insights["sentiment_distribution"]
         
         # Convert keyword dicts to KeywordStat models
         keyword_stats = [
             KeywordStat(keyword=kw["keyword"], count=kw["count"], percentage=kw["percentage"])
-            for kw in top_keywords
+            for kw in insights["top_keywords"]
         ]
         
-        return InsightsResponse(
-            total_feedback=total_feedback,
+        response = InsightsResponse(
+            total_feedback=insights["total_feedback"],
             sentiment_distribution=SentimentDistribution(
                 positive=sentiment_dist["positive"],
                 negative=sentiment_dist["negative"],
                 neutral=sentiment_dist["neutral"]
             ),
             top_keywords=keyword_stats,
-            average_confidence=avg_confidence,
-            average_polarity=avg_polarity,
+            average_confidence=insights["average_confidence"],
+            average_polarity=insights["average_polarity"],
             success=True,
             message="Insights generated successfully"
         )
         
+        payload = orjson.dumps(response.model_dump())
+        _insights_payload = (version, payload)
+        return Response(content=payload, media_type="application/json")
+        
     except Exception as e:
-        logger.error(f"Error generating insights: {str(e)}", exc_info=True)
+        logger.error("Error generating insights: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate insights: {str(e)}"
@@ -248,8 +464,8 @@ async def get_feedback_insights():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler."""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An internal server error occurred"}
     )
@@ -257,5 +473,13 @@ async def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One server worker per CPU by default; exported so the workers size
+    # their OCR pools to match
+    workers = os.environ.setdefault("WEB_CONCURRENCY", str(os.cpu_count() or 1))
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(workers)
+    )
 
@@ -2,33 +2,109 @@
 In-memory data store for feedback analytics.
 In production, this would be replaced with a proper database.
 """
-from typing import List, Dict
+import os
+import sys
+from typing import Any, Deque, List, Dict
 from datetime import datetime
-from collections import Counter
+from collections import Counter, deque
+from contextlib import contextmanager
+from operator import itemgetter
+import heapq
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+
+
+class ReadWriteLock:
+    """
+    Read-preferring reader-writer lock.
+    
+    Any number of readers may hold the lock at once; a writer waits until
+    there are no readers and then holds it exclusively.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+    
+    @contextmanager
+    def read_lock(self):
+        """Acquire the lock for shared reading."""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write_lock(self):
+        """Acquire the lock for exclusive writing."""
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
 
 class FeedbackRecord:
     """Represents a single feedback record."""
+    # No per-instance __dict__: the store retains up to max_records of these
+    __slots__ = (
+        "feedback", "sentiment", "polarity", "subjectivity",
+        "keywords", "confidence", "timestamp"
+    )
+    
     def __init__(self, feedback: str, sentiment: str, polarity: float, 
                  subjectivity: float, keywords: List[str], confidence: float):
         self.feedback = feedback
         self.sentiment = sentiment
         self.polarity = polarity
         self.subjectivity = subjectivity
-        self.keywords = keywords
+        # Keywords recur heavily across records; store them as an immutable
+        # tuple of interned strings so repeats share one string object
+        self.keywords = tuple(sys.intern(keyword) for keyword in keywords)
         self.confidence = confidence
         self.timestamp = datetime.now()
 
 
 class FeedbackStore:
-    """In-memory store for feedback records."""
+    """
+    In-memory store for feedback records.
     
-    def __init__(self):
-        self._records: List[FeedbackRecord] = []
-        self._lock = False  # Simple lock for thread safety (basic implementation)
+    Records are append-only, so the aggregate statistics are maintained
+    incrementally on insert and read back in constant time.
+    
+    Memory is bounded: only the most recent max_records records are kept,
+    while the aggregates cover all feedback ever added. Keyword counts are
+    pruned to the most frequent keywords once more than max_tracked_keywords
+    distinct keywords are tracked, so counts of rare keywords are approximate.
+    """
+    
+    def __init__(self, max_records: int = 100_000, max_tracked_keywords: int = 50_000):
+        self._records: Deque[FeedbackRecord] = deque(maxlen=max_records)
+        self._max_tracked_keywords = max_tracked_keywords
+        self._lock = ReadWriteLock()
+        self._version = 0  # Bumped on every write, so readers can tell when aggregates changed
+        self._total = 0
+        self._sum_polarity = 0.0
+        self._sum_confidence = 0.0
+        self._sentiment_counts: Counter = Counter()
+        self._keyword_counts: Counter = Counter()
     
     def add_feedback(self, feedback: str, sentiment: str, polarity: float,
                      subjectivity: float, keywords: List[str], confidence: float) -> None:
@@ -51,12 +127,31 @@ class FeedbackStore:
             keywords=keywords,
             confidence=confidence
         )
-        self._records.append(record)
-        logger.info(f"Added feedback record. Total records: {len(self._records)}")
+        with self._lock.write_lock():
+            self._records.append(record)
+            self._version += 1
+            
+            # Update running aggregates
+            self._total += 1
+            self._sum_polarity += polarity
+            self._sum_confidence += confidence
+            self._sentiment_counts[sentiment] += 1
+            self._keyword_counts.update(record.keywords)
+            if len(self._keyword_counts) > self._max_tracked_keywords:
+                self._prune_keywords()
+            total = self._total
+        
+        logger.debug("Added feedback record. Total records: %d", total)
+    
+    def _prune_keywords(self) -> None:
+        """Keep only the most frequent half of the tracked keywords."""
+        keep = heapq.nlargest(self._max_tracked_keywords // 2, self._keyword_counts.items(), key=itemgetter(1))
+        self._keyword_counts = Counter(dict(keep))
     
     def get_all_records(self) -> List[FeedbackRecord]:
-        """Get all feedback records."""
-        return self._records.copy()
+        """Get the retained (most recent) feedback records."""
+        with self._lock.read_lock():
+            return list(self._records)
     
     def get_sentiment_distribution(self) -> Dict[str, float]:
         """
@@ -65,17 +160,16 @@ class FeedbackStore:
         Returns:
             Dictionary with sentiment labels as keys and percentages as values
         """
-        if not self._records:
-            return {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
-        
-        sentiment_counts = Counter(record.sentiment for record in self._records)
-        total = len(self._records)
-        
-        distribution = {
-            "positive": round((sentiment_counts.get("positive", 0) / total) * 100, 2),
-            "negative": round((sentiment_counts.get("negative", 0) / total) * 100, 2),
-            "neutral": round((sentiment_counts.get("neutral", 0) / total) * 100, 2)
-        }
+        with self._lock.read_lock():
+            if not self._total:
+                return {label: 0.0 for label in SENTIMENT_LABELS}
+            
+            total = self._total
+            
+            distribution = {
+                label: round((self._sentiment_counts.get(label, 0) / total) * 100, 2)
+                for label in SENTIMENT_LABELS
+            }
         
         return distribution
     
@@ -89,47 +183,83 @@ class FeedbackStore:
         Returns:
             List of dictionaries with keyword and count
         """
-        if not self._records:
-            return []
-        
-        # Aggregate all keywords
-        all_keywords = []
-        for record in self._records:
-            all_keywords.extend(record.keywords)
-        
-        # Count keyword frequency
-        keyword_counts = Counter(all_keywords)
-        
-        # Get top keywords
-        top_keywords = [
-            {"keyword": keyword, "count": count, "percentage": round((count / len(self._records)) * 100, 2)}
-            for keyword, count in keyword_counts.most_common(limit)
-        ]
+        with self._lock.read_lock():
+            if not self._total:
+                return []
+            
+            # Select top keywords from the running counts with a bounded heap
+            total = self._total
+            top_keywords = [
+                {"keyword": keyword, "count": count, "percentage": round((count / total) * 100, 2)}
+                for keyword, count in heapq.nlargest(limit, self._keyword_counts.items(), key=itemgetter(1))
+            ]
         
         return top_keywords
     
     def get_total_count(self) -> int:
         """Get total number of feedback records."""
-        return len(self._records)
+        with self._lock.read_lock():
+            return self._total
     
     def get_average_confidence(self) -> float:
         """Get average confidence score across all records."""
-        if not self._records:
-            return 0.0
-        return round(sum(record.confidence for record in self._records) / len(self._records), 3)
+        with self._lock.read_lock():
+            if not self._total:
+                return 0.0
+            return round(self._sum_confidence / self._total, 3)
     
     def get_average_polarity(self) -> float:
         """Get average polarity score across all records."""
-        if not self._records:
-            return 0.0
-        return round(sum(record.polarity for record in self._records) / len(self._records), 3)
+        with self._lock.read_lock():
+            if not self._total:
+                return 0.0
+            return round(self._sum_polarity / self._total, 3)
+    
+    @property
+    def version(self) -> int:
+        """
+        Write counter, bumped by every add_feedback and clear.
+        
+        Aggregates derived from the store stay valid while it is unchanged,
+        so callers can cache them keyed on it.
+        """
+        return self._version
+    
+    def get_insights(self, keyword_limit: int = 20) -> Dict[str, Any]:
+        """
+        Get a consistent snapshot of all aggregate statistics.
+        
+        Args:
+            keyword_limit: Maximum number of top keywords to include
+            
+        Returns:
+            Dictionary with total_feedback, sentiment_distribution, top_keywords,
+            average_confidence and average_polarity
+        """
+        with self._lock.read_lock():
+            return {
+                "total_feedback": self.get_total_count(),
+                "sentiment_distribution": self.get_sentiment_distribution(),
+                "top_keywords": self.get_top_keywords(limit=keyword_limit),
+                "average_confidence": self.get_average_confidence(),
+                "average_polarity": self.get_average_polarity()
+            }
     
     def clear(self) -> None:
         """Clear all records (useful for testing)."""
-        self._records.clear()
+        with self._lock.write_lock():
+            self._records.clear()
+            self._version += 1
+            self._total = 0
+            self._sum_polarity = 0.0
+            self._sum_confidence = 0.0
+            self._sentiment_counts.clear()
+            self._keyword_counts.clear()
         logger.info("Feedback store cleared")
 
 
 # Global instance
-feedback_store = FeedbackStore()
+feedback_store = FeedbackStore(
+    max_records=int(os.getenv("FEEDBACK_STORE_MAX_RECORDS", "100000"))
+)
 
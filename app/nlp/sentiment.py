@@ -1,15 +1,44 @@
 """
 NLP service module for analyzing customer feedback.
-Provides sentiment analysis and keyword extraction.
+Provides sentiment analysis (VADER) and keyword extraction (TextBlob).
 """
 import re
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from collections import Counter
 
 logger = logging.getLogger(__name__)
 
+# Standard VADER compound-score cutoffs for positive/negative sentiment
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Text cleanup patterns, compiled once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+_DISALLOWED_CHARS_RE = re.compile(r'[^\w\s.,!?;:\-()]+')
+
+# Common stop words filtered out of keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'what', 'which', 'who', 'when', 'where', 'why', 'how', 'all', 'each',
+    'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such',
+    'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too',
+    'very', 'just', 'now'
+})
+
+# Part-of-speech tag prefixes kept as keywords: nouns, adjectives, verbs
+_KEYWORD_POS_PREFIXES = frozenset({'NN', 'JJ', 'VB'})
+
+# VADER loads its lexicon on construction, so share one analyzer per process
+_vader = SentimentIntensityAnalyzer()
+
 
 class SentimentResult:
     """Result of sentiment analysis."""
@@ -24,14 +53,14 @@ class SentimentResult:
         Classify sentiment based on polarity score.
         
         Args:
-            polarity: Sentiment polarity (-1 to 1)
+            polarity: Sentiment polarity (VADER compound score, -1 to 1)
             
         Returns:
             Sentiment label: 'positive', 'negative', or 'neutral'
         """
-        if polarity > 0.1:
+        if polarity >= POSITIVE_THRESHOLD:
             return "positive"
-        elif polarity < -0.1:
+        elif polarity <= NEGATIVE_THRESHOLD:
             return "negative"
         else:
             return "neutral"
@@ -59,6 +88,25 @@ class SentimentResult:
         return min(1.0, max(0.0, confidence))
 
 
+@lru_cache(maxsize=10000)
+def _analyze_cached(text: str) -> Tuple[float, float]:
+    """
+    Compute (polarity, subjectivity) for text, memoized on the text.
+    
+    Polarity is VADER's normalized compound score. VADER has no subjectivity
+    measure, so it is approximated by the share of the text that carries
+    sentiment (1 - neutral proportion).
+    
+    Args:
+        text: Preprocessed input text
+        
+    Returns:
+        Tuple of polarity and subjectivity scores
+    """
+    scores = _vader.polarity_scores(text)
+    return scores["compound"], 1.0 - scores["neu"]
+
+
 def analyze_sentiment(text: str) -> SentimentResult:
     """
     Analyze sentiment of the given text.
@@ -70,17 +118,52 @@ def analyze_sentiment(text: str) -> SentimentResult:
         SentimentResult object with sentiment analysis
     """
     try:
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
+        polarity, subjectivity = _analyze_cached(text)
         return SentimentResult(polarity, subjectivity)
     except Exception as e:
-        logger.error(f"Sentiment analysis failed: {str(e)}")
+        logger.error("Sentiment analysis failed: %s", e)
         # Return neutral sentiment on error
         return SentimentResult(0.0, 0.5)
 
 
+@lru_cache(maxsize=10000)
+def _extract_keywords_cached(text: str, max_keywords: int) -> Tuple[str, ...]:
+    """
+    Extract keywords from text, memoized on the text and limit.
+    
+    Args:
+        text: Preprocessed input text
+        max_keywords: Maximum number of keywords to return
+        
+    Returns:
+        Tuple of keyword strings
+    """
+    blob = TextBlob(text.lower())
+    
+    # Get noun phrases (multi-word keywords)
+    noun_phrases = [str(phrase) for phrase in blob.noun_phrases]
+    
+    # Get individual significant words (nouns, adjectives, verbs)
+    # Extract significant words (length > 2, not stop words)
+    words = [
+        word for word, tag in blob.tags
+        if len(word) > 2
+        and word not in _STOP_WORDS
+        and tag[:2] in _KEYWORD_POS_PREFIXES
+    ]
+    
+    # Combine noun phrases and words, count frequency
+    all_keywords = noun_phrases + words
+    keyword_counts = Counter(all_keywords)
+    
+    # Get top keywords by frequency
+    top_keywords = [
+        keyword for keyword, count in keyword_counts.most_common(max_keywords)
+    ]
+    
+    return tuple(top_keywords[:max_keywords])
+
+
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """
     Extract keywords from text using noun phrases and word frequency.
@@ -93,49 +176,30 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
         List of keyword strings
     """
     try:
-        blob = TextBlob(text.lower())
-        
-        # Get noun phrases (multi-word keywords)
-        noun_phrases = [str(phrase) for phrase in blob.noun_phrases]
-        
-        # Get individual significant words (nouns, adjectives, verbs)
-        # Filter out common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'what', 'which', 'who', 'when', 'where', 'why', 'how', 'all', 'each',
-            'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such',
-            'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too',
-            'very', 'just', 'now'
-        }
-        
-        # Extract significant words (length > 2, not stop words)
-        words = [
-            word for word, tag in blob.tags
-            if len(word) > 2
-            and word not in stop_words
-            and tag.startswith(('NN', 'JJ', 'VB'))  # Nouns, adjectives, verbs
-        ]
-        
-        # Combine noun phrases and words, count frequency
-        all_keywords = noun_phrases + words
-        keyword_counts = Counter(all_keywords)
-        
-        # Get top keywords by frequency
-        top_keywords = [
-            keyword for keyword, count in keyword_counts.most_common(max_keywords)
-        ]
-        
-        return top_keywords[:max_keywords]
+        return list(_extract_keywords_cached(text, max_keywords))
     
     except Exception as e:
-        logger.error(f"Keyword extraction failed: {str(e)}")
+        logger.error("Keyword extraction failed: %s", e)
         return []
 
 
+def analyze_texts(texts: List[str], max_keywords: int = 10) -> List[Tuple[SentimentResult, List[str]]]:
+    """
+    Analyze sentiment and extract keywords for a batch of texts.
+    
+    Args:
+        texts: Preprocessed input texts
+        max_keywords: Maximum number of keywords to return per text
+        
+    Returns:
+        List of (SentimentResult, keywords) tuples, in the same order as texts
+    """
+    return [
+        (analyze_sentiment(text), extract_keywords(text, max_keywords=max_keywords))
+        for text in texts
+    ]
+
+
 def preprocess_text(text: str) -> str:
     """
     Preprocess text for better analysis.
@@ -150,10 +214,10 @@ def preprocess_text(text: str) -> str:
         return ""
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     # Remove special characters but keep basic punctuation
-    text = re.sub(r'[^\w\s.,!?;:\-()]', '', text)
+    text = _DISALLOWED_CHARS_RE.sub('', text)
     
     return text.strip()
 
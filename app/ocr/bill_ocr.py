@@ -2,37 +2,238 @@
 OCR module for bill processing.
 Extracts text from images and parses structured data.
 """
+import math
+import os
 import re
 import logging
-from typing import List, Optional
+import threading
+from typing import List, Optional, Tuple
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageFilter, ImageStat
 import io
 
+try:
+    # Linear-time regex engine, immune to catastrophic backtracking on noisy OCR text
+    from re2 import compile as _compile
+except ImportError:  # google-re2 not available, fall back to the stdlib engine
+    def _compile(pattern: str):
+        # re2 word boundaries are ASCII-only; make \b behave the same under re
+        return re.compile(pattern, re.ASCII)
+
+try:
+    # libjpeg-turbo bindings for fast JPEG decoding
+    from turbojpeg import TurboJPEG, TJPF_GRAY
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):  # module or native library not available
+    _turbo_jpeg = None
+
+try:
+    from tesserocr import PyTessBaseAPI
+except ImportError:  # tesserocr not available, fall back to the pytesseract subprocess
+    PyTessBaseAPI = None
+
 from app.schemas import ServiceItem
 
 logger = logging.getLogger(__name__)
 
+# Longest image edge passed to Tesseract; larger images are downscaled
+OCR_MAX_IMAGE_SIDE = int(os.getenv("OCR_MAX_IMAGE_SIDE", "2000"))
+
+# Pre-OCR gate thresholds: images below both are treated as containing no text
+OCR_MIN_EDGE_VARIANCE = float(os.getenv("OCR_MIN_EDGE_VARIANCE", "1.0"))
+OCR_MIN_INK_RATIO = float(os.getenv("OCR_MIN_INK_RATIO", "0.00002"))
+# Pixels at least this many gray levels darker than the background count as ink
+OCR_INK_CONTRAST = int(os.getenv("OCR_INK_CONTRAST", "24"))
+_LAPLACIAN_KERNEL = ImageFilter.Kernel((3, 3), (0, 1, 0, 1, -4, 1, 0, 1, 0), scale=1, offset=128)
+
+# Patterns to match service names followed by prices, compiled once at import.
+# Flags are given inline and character classes spelled out in ASCII, so the
+# patterns compile, and match the same text, under both re2 and re.
+# Matches: service name (with spaces, dashes, etc.) followed by currency symbol and price
+_SERVICE_PATTERNS = (
+    # Pattern 1: Service Name $XX.XX or Service Name $XX
+    _compile(r'(?m)([A-Za-z0-9 \t\n\r\f\v\-&,\.]+?)[ \t\n\r\f\v]+\$?([0-9]+\.?[0-9]{0,2})'),
+    # Pattern 2: Service Name: $XX.XX
+    _compile(r'(?m)([A-Za-z0-9 \t\n\r\f\v\-&,\.]+?):[ \t\n\r\f\v]+\$?([0-9]+\.?[0-9]{0,2})'),
+    # Pattern 3: Service Name - $XX.XX
+    _compile(r'(?m)([A-Za-z0-9 \t\n\r\f\v\-&,\.]+?)[ \t\n\r\f\v]+-[ \t\n\r\f\v]+\$?([0-9]+\.?[0-9]{0,2})'),
+)
+_DATE_LIKE_RE = _compile(r'^[0-9]{1,2}[/\-][0-9]{1,2}[/\-][0-9]{2,4}$')
+
+# Supported date formats in one alternation, so the text is scanned once
+_DATE_RE = _compile(
+    r'(?i)\b(?:'
+    # MM/DD/YYYY or MM-DD-YYYY
+    r'[0-9]{1,2}[/\-][0-9]{1,2}[/\-][0-9]{2,4}'
+    # YYYY-MM-DD
+    r'|[0-9]{4}[/\-][0-9]{1,2}[/\-][0-9]{1,2}'
+    # Month DD, YYYY
+    r'|(?:January|February|March|April|May|June|July|August|September|October|November|December)[ \t\n\r\f\v]+[0-9]{1,2},?[ \t\n\r\f\v]+[0-9]{4}'
+    r')\b'
+)
+
+# Persistent Tesseract handle per thread (one per OCR worker process in practice)
+_tess_local = threading.local()
+
+
+def _get_tess_api():
+    """
+    Get the Tesseract API handle for the current thread, creating it on first use.
+    
+    Returns:
+        PyTessBaseAPI instance with the language model loaded
+    """
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        api = PyTessBaseAPI()
+        _tess_local.api = api
+    return api
+
+
+def init_ocr_worker() -> None:
+    """
+    Initialize an OCR worker process.
+    
+    Loads the Tesseract engine once so the first request handled by the
+    worker does not pay the model load cost.
+    """
+    if PyTessBaseAPI is not None:
+        _get_tess_api()
+
+
+def _jpeg_scaling_factor(width: int, height: int) -> Tuple[int, int]:
+    """
+    Pick the smallest libjpeg-turbo scaling factor that keeps the image at
+    least OCR_MAX_IMAGE_SIDE on its longest edge.
+    
+    Args:
+        width: Source image width
+        height: Source image height
+        
+    Returns:
+        Scaling factor as a (numerator, denominator) tuple
+    """
+    longest = max(width, height)
+    best = (1, 1)
+    for num, denom in _turbo_jpeg.scaling_factors:
+        if num / denom < best[0] / best[1] and longest * num / denom >= OCR_MAX_IMAGE_SIDE:
+            best = (num, denom)
+    return best
+
+
+def decode_image(image_bytes: bytes) -> Image.Image:
+    """
+    Decode image bytes into a PIL image.
+    
+    JPEGs are decoded straight to grayscale by libjpeg-turbo when it is
+    available, scaling down during decoding for large photos. Other formats,
+    or JPEGs libjpeg-turbo cannot handle, go through PIL.
+    
+    Args:
+        image_bytes: Image file as bytes
+        
+    Returns:
+        Decoded PIL image
+    """
+    if _turbo_jpeg is not None and image_bytes[:2] == b'\xff\xd8':
+        try:
+            width, height, _, _ = _turbo_jpeg.decode_header(image_bytes)
+            pixels = _turbo_jpeg.decode(
+                image_bytes,
+                pixel_format=TJPF_GRAY,
+                scaling_factor=_jpeg_scaling_factor(width, height)
+            )
+            return Image.fromarray(pixels[:, :, 0])
+        except Exception as e:
+            logger.warning("libjpeg-turbo decode failed, falling back to PIL: %s", e)
+    return Image.open(io.BytesIO(image_bytes))
+
+
+def prepare_image_for_ocr(image: Image.Image) -> Image.Image:
+    """
+    Convert an image to grayscale and cap its size for OCR.
+    
+    Tesseract cost grows with pixel count, and printed bills gain no accuracy
+    beyond roughly 300 DPI, so the longest edge is limited to OCR_MAX_IMAGE_SIDE.
+    
+    Args:
+        image: Freshly opened PIL image
+        
+    Returns:
+        Grayscale image no larger than OCR_MAX_IMAGE_SIDE on either edge
+    """
+    # For JPEGs opened by PIL, let the decoder scale down during decoding.
+    # draft() only reduces while the result still covers the requested box,
+    # so the box must follow the image's aspect ratio
+    scale = OCR_MAX_IMAGE_SIDE / max(image.size)
+    if scale < 1:
+        image.draft("L", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    gray = image.convert("L")
+    gray.thumbnail((OCR_MAX_IMAGE_SIDE, OCR_MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
+    return gray
+
+
+def has_detectable_text(image: Image.Image) -> bool:
+    """
+    Cheaply check whether an image is worth running OCR on.
+    
+    Computes the variance of the Laplacian (edge sharpness) and the ratio of
+    ink pixels, those clearly darker than the median (background) level.
+    Both are measured at the resolution passed to Tesseract, so small or
+    faint text is not lost to downscaling. Blank or near-uniform images
+    score low on both.
+    
+    Args:
+        image: PIL image to check, as prepared for OCR
+        
+    Returns:
+        False if the image has no detectable text, True otherwise
+    """
+    gray = image.convert("L")
+    
+    # Pillow copies border pixels unfiltered, so drop them before measuring
+    edges = gray.filter(_LAPLACIAN_KERNEL)
+    edges = edges.crop((1, 1, max(edges.width - 1, 1), max(edges.height - 1, 1)))
+    edge_variance = ImageStat.Stat(edges).var[0]
+    
+    # Relative to the background, so faded or gray print still counts as ink
+    stat = ImageStat.Stat(gray)
+    ink_cutoff = max(stat.median[0] - OCR_INK_CONTRAST, 0)
+    histogram = gray.histogram()
+    ink_ratio = sum(histogram[:ink_cutoff]) / max(stat.count[0], 1)
+    
+    return edge_variance >= OCR_MIN_EDGE_VARIANCE or ink_ratio >= OCR_MIN_INK_RATIO
+
 
 def extract_text_from_image(image_bytes: bytes) -> str:
     """
-    Extract raw text from image using pytesseract.
+    Extract raw text from image using Tesseract.
+    
+    Uses the in-process tesserocr bindings when installed, otherwise
+    falls back to pytesseract.
     
     Args:
         image_bytes: Image file as bytes
         
     Returns:
-        Extracted text string
+        Extracted text string, empty if the image has no detectable text
         
     Raises:
         Exception: If OCR processing fails
     """
     try:
-        image = Image.open(io.BytesIO(image_bytes))
+        image = prepare_image_for_ocr(decode_image(image_bytes))
+        if not has_detectable_text(image):
+            logger.info("Skipping OCR: no detectable text in image")
+            return ""
+        if PyTessBaseAPI is not None:
+            api = _get_tess_api()
+            api.SetImage(image)
+            return api.GetUTF8Text()
         text = pytesseract.image_to_string(image)
         return text
     except Exception as e:
-        logger.error(f"OCR extraction failed: {str(e)}")
+        logger.error("OCR extraction failed: %s", e)
         raise Exception(f"Failed to extract text from image: {str(e)}")
 
 
@@ -52,22 +253,10 @@ def parse_services(text: str) -> List[ServiceItem]:
         List of ServiceItem objects
     """
     services = []
-    
-    # Pattern to match service names followed by prices
-    # Matches: service name (with spaces, dashes, etc.) followed by currency symbol and price
-    price_patterns = [
-        # Pattern 1: Service Name $XX.XX or Service Name $XX
-        r'([A-Za-z0-9\s\-&,\.]+?)\s+\$?(\d+\.?\d{0,2})',
-        # Pattern 2: Service Name: $XX.XX
-        r'([A-Za-z0-9\s\-&,\.]+?):\s+\$?(\d+\.?\d{0,2})',
-        # Pattern 3: Service Name - $XX.XX
-        r'([A-Za-z0-9\s\-&,\.]+?)\s+-\s+\$?(\d+\.?\d{0,2})',
-    ]
-    
     seen_services = set()
     
-    for pattern in price_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
+    for pattern in _SERVICE_PATTERNS:
+        matches = pattern.finditer(text)
         for match in matches:
             service_name = match.group(1).strip()
             price_str = match.group(2).strip()
@@ -77,7 +266,7 @@ def parse_services(text: str) -> List[ServiceItem]:
                 continue
             
             # Skip if it looks like a date or other non-service text
-            if re.match(r'^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}$', service_name):
+            if _DATE_LIKE_RE.match(service_name):
                 continue
             
             try:
@@ -111,22 +300,10 @@ def parse_date(text: str) -> Optional[str]:
     Returns:
         Date string if found, None otherwise
     """
-    date_patterns = [
-        # MM/DD/YYYY or MM-DD-YYYY
-        r'\b(\d{1,2})[/\-](\d{1,2})[/\-](\d{2,4})\b',
-        # YYYY-MM-DD
-        r'\b(\d{4})[/\-](\d{1,2})[/\-](\d{1,2})\b',
-        # Month DD, YYYY
-        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(\d{4})\b',
-    ]
-    
-    for pattern in date_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            date_str = match.group(0)
-            # Validate that it's a reasonable date
-            if len(date_str) >= 6:  # Minimum reasonable date length
-                return date_str
+    match = _DATE_RE.search(text)
+    # Validate that it's a reasonable date
+    if match and len(match.group(0)) >= 6:  # Minimum reasonable date length
+        return match.group(0)
     
     return None
 
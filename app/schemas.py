@@ -37,6 +37,23 @@ class FeedbackResponse(BaseModel):
     message: str
 
 
+class BatchFeedbackRequest(BaseModel):
+    """Request model for batch NLP feedback endpoint."""
+    feedback: List[str] = Field(
+        ...,
+        description="Customer feedback texts to analyze",
+        min_length=1,
+        max_length=100
+    )
+
+
+class BatchFeedbackResponse(BaseModel):
+    """Response model for batch NLP feedback endpoint."""
+    results: List[FeedbackResponse] = Field(..., description="Analysis results, in request order")
+    success: bool
+    message: str
+
+
 class SentimentDistribution(BaseModel):
     """Sentiment distribution model."""
     positive: float = Field(..., description="Percentage of positive feedback", ge=0.0, le=100.0)
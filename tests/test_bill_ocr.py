@@ -0,0 +1,45 @@
+"""
+Tests for the pre-OCR text detection gate.
+"""
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.ocr.bill_ocr import extract_text_from_image, has_detectable_text, prepare_image_for_ocr
+
+
+def make_page(text_gray=None, size=2000, background=255):
+    """Build a blank page, optionally with one short line of text."""
+    image = Image.new("L", (size, size), background)
+    if text_gray is not None:
+        ImageDraw.Draw(image).text((100, size // 2), "Consultation fee $45.00", fill=text_gray)
+    return image
+
+
+def to_bytes(image, image_format="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG"])
+def test_blank_page_has_no_detectable_text(image_format):
+    image = Image.open(io.BytesIO(to_bytes(make_page(), image_format)))
+    assert not has_detectable_text(prepare_image_for_ocr(image))
+
+
+@pytest.mark.parametrize("text_gray", [0, 120, 160, 190])
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG"])
+def test_sparse_faint_text_is_detected(text_gray, image_format):
+    image = Image.open(io.BytesIO(to_bytes(make_page(text_gray), image_format)))
+    assert has_detectable_text(prepare_image_for_ocr(image))
+
+
+def test_faint_text_on_gray_background_is_detected():
+    image = make_page(text_gray=150, background=200)
+    assert has_detectable_text(prepare_image_for_ocr(image))
+
+
+def test_blank_page_skips_ocr():
+    assert extract_text_from_image(to_bytes(make_page())) == ""
@@ -0,0 +1,22 @@
+"""
+Tests for bill text parsing.
+
+The parsing patterns use ASCII character classes so that results are the
+same whether google-re2 or the stdlib re fallback is installed.
+"""
+from app.ocr.bill_ocr import parse_date, parse_services
+
+
+def test_non_ascii_space_is_not_part_of_service_name():
+    services = parse_services("Item\xa0Name $5")
+    assert [(service.name, service.price) for service in services] == [("Name", 5.0)]
+
+
+def test_non_ascii_digits_are_not_parsed():
+    text = "Consult ٣٤.٠٠\nDate ٠١/٠٢/٢٠٢٠"
+    assert parse_services(text) == []
+    assert parse_date(text) is None
+
+
+def test_date_word_boundary_uses_ascii_word_characters():
+    assert parse_date("é12/03/2020 and 01/02/2021") == "12/03/2020"